@@ -4,7 +4,195 @@ This module contains the rule-based categorization function for transactions.
 """
 
 import re
-from typing import Dict, List
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Category keywords, in priority order (first matching category wins)
+CATEGORY_KEYWORDS = {
+    "Food & Dining": [
+        "restaurant", "cafe", "coffee", "starbucks", "mcdonald", "burger", "pizza",
+        "food", "dining", "lunch", "dinner", "breakfast", "snack", "grocery",
+        "supermarket", "walmart", "target", "costco", "whole foods", "trader joe",
+        "domino", "subway", "kfc", "taco bell", "chipotle", "panera", "dunkin",
+        "bakery", "deli", "bistro", "grill", "bar", "pub", "kitchen", "eatery"
+    ],
+    
+    "Transportation": [
+        "uber", "lyft", "taxi", "gas", "fuel", "parking", "metro", "bus",
+        "train", "airline", "flight", "car", "vehicle", "auto", "transport",
+        "toll", "subway", "transit", "rental", "hertz", "enterprise", "avis",
+        "shell", "exxon", "chevron", "bp", "mobil", "citgo", "speedway"
+    ],
+    
+    "Utilities": [
+        "electric", "electricity", "gas", "water", "internet", "phone", "cable",
+        "utility", "bill", "energy", "power", "heating", "cooling", "trash",
+        "waste", "sewer", "telecom", "verizon", "att", "comcast", "spectrum",
+        "xfinity", "cox", "dish", "directv", "netflix", "hulu", "spotify"
+    ],
+    
+    "Shopping": [
+        "amazon", "ebay", "store", "shop", "retail", "mall", "outlet", "purchase",
+        "buy", "clothing", "clothes", "shoes", "electronics", "home depot",
+        "lowes", "best buy", "apple", "microsoft", "nike", "adidas", "zara",
+        "h&m", "gap", "old navy", "macys", "nordstrom", "sears", "kohl",
+        "tj maxx", "marshall", "ross", "department", "boutique"
+    ],
+    
+    "Entertainment": [
+        "movie", "cinema", "theater", "concert", "music", "game", "gaming",
+        "entertainment", "fun", "leisure", "hobby", "sport", "gym", "fitness",
+        "club", "bar", "nightclub", "casino", "lottery", "ticket", "event",
+        "amusement", "park", "zoo", "museum", "gallery", "show", "performance",
+        "netflix", "hulu", "disney", "spotify", "youtube", "twitch", "steam"
+    ],
+    
+    "Healthcare": [
+        "doctor", "hospital", "medical", "health", "pharmacy", "medicine",
+        "dental", "dentist", "clinic", "urgent care", "emergency", "prescription",
+        "drug", "cvs", "walgreens", "rite aid", "insurance", "copay", "deductible",
+        "therapy", "physical therapy", "mental health", "counseling", "wellness"
+    ],
+    
+    "Income": [
+        "salary", "wage", "payroll", "income", "deposit", "payment", "refund",
+        "cashback", "bonus", "commission", "dividend", "interest", "transfer",
+        "reimbursement", "tax refund", "social security", "pension", "unemployment",
+        "freelance", "consulting", "contract", "gig", "tip", "gratuity"
+    ],
+    
+    "Education": [
+        "school", "university", "college", "education", "tuition", "book",
+        "textbook", "course", "class", "training", "workshop", "seminar",
+        "certification", "degree", "diploma", "student", "academic", "learning",
+        "library", "research", "study", "exam", "test", "scholarship"
+    ],
+    
+    "Banking": [
+        "bank", "atm", "fee", "charge", "overdraft", "maintenance", "service",
+        "transfer", "wire", "check", "deposit", "withdrawal", "balance",
+        "account", "credit", "debit", "loan", "mortgage", "interest",
+        "finance", "investment", "savings", "checking", "penalty"
+    ]
+}
+
+# All categories a transaction can end up in, in priority order. Vectorized
+# categorization works on int8 codes into this list and only maps them to
+# names (these same string objects) when building the result.
+CATEGORIES = [*CATEGORY_KEYWORDS, "Others"]
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+OTHERS_CODE = CATEGORY_CODES["Others"]
+
+# One precompiled alternation per category, so a description (or a whole
+# column) is scanned once per category instead of once per keyword
+CATEGORY_PATTERNS = {
+    category: re.compile("|".join(re.escape(keyword) for keyword in keywords))
+    for category, keywords in CATEGORY_KEYWORDS.items()
+}
+
+# Every keyword gets an integer id in priority order, so the lowest matching
+# id always belongs to the highest-priority category. Keywords listed under
+# several categories keep the id (and category) of their first listing.
+KEYWORD_IDS = {}
+for _code, _keywords in enumerate(CATEGORY_KEYWORDS.values()):
+    for _keyword in _keywords:
+        KEYWORD_IDS.setdefault(_keyword, (len(KEYWORD_IDS), _code))
+
+# Category code for each keyword id
+KEYWORD_CATEGORY_CODES = np.array([code for _, code in KEYWORD_IDS.values()], dtype=np.int8)
+
+def _build_keyword_automaton():
+    """
+    Build an Aho-Corasick automaton mapping every keyword to its keyword id.
+
+    Returns:
+        ahocorasick.Automaton: Automaton whose values are keyword ids
+    """
+    automaton = ahocorasick.Automaton()
+    for keyword, (keyword_id, _) in KEYWORD_IDS.items():
+        automaton.add_word(keyword, keyword_id)
+    automaton.make_automaton()
+    return automaton
+
+# Single-pass multi-keyword matcher (None when pyahocorasick isn't installed)
+KEYWORD_AUTOMATON = _build_keyword_automaton() if ahocorasick is not None else None
+
+def _first_keyword_hit(desc_lower: str) -> int:
+    """
+    Find the lowest keyword id matching a lowercased description.
+
+    Requires KEYWORD_AUTOMATON.
+
+    Args:
+        desc_lower (str): Lowercased transaction description
+
+    Returns:
+        int: Keyword id, or -1 if no keyword matches
+    """
+    best = -1
+    for _, keyword_id in KEYWORD_AUTOMATON.iter(desc_lower):
+        if best < 0 or keyword_id < best:
+            best = keyword_id
+            if best == 0:
+                break
+    return best
+
+def _match_category(desc_lower: str):
+    """
+    Find the highest-priority category with a keyword in a lowercased description.
+
+    Args:
+        desc_lower (str): Lowercased transaction description
+
+    Returns:
+        str or None: Category name, or None if no keyword matches
+    """
+    if KEYWORD_AUTOMATON is not None:
+        keyword_id = _first_keyword_hit(desc_lower)
+        return CATEGORIES[KEYWORD_CATEGORY_CODES[keyword_id]] if keyword_id >= 0 else None
+
+    for category, pattern in CATEGORY_PATTERNS.items():
+        if pattern.search(desc_lower):
+            return category
+    return None
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _assign_category_codes(hits, keyword_codes, others_code, out):
+        for i in prange(hits.shape[0]):
+            k = hits[i]
+            out[i] = keyword_codes[k] if k >= 0 else others_code
+
+def keyword_hits_to_codes(hits: np.ndarray) -> np.ndarray:
+    """
+    Map per-row keyword ids to category codes.
+
+    Uses a compiled Numba loop when Numba is installed and plain numpy
+    indexing otherwise. Only integer arrays cross into Numba.
+
+    Args:
+        hits (np.ndarray): Keyword id per row (int32), -1 where nothing matched
+
+    Returns:
+        np.ndarray: Category code per row (int8), indexing into CATEGORIES
+    """
+    if njit is not None:
+        codes = np.empty(hits.shape[0], dtype=np.int8)
+        _assign_category_codes(hits, KEYWORD_CATEGORY_CODES, np.int8(OTHERS_CODE), codes)
+        return codes
+    return np.where(hits >= 0, KEYWORD_CATEGORY_CODES[hits], OTHERS_CODE).astype(np.int8)
 
 def categorize_transaction(description: str) -> str:
     """
@@ -22,80 +210,10 @@ def categorize_transaction(description: str) -> str:
     # Convert to lowercase for case-insensitive matching
     desc_lower = description.lower()
     
-    # Define category keywords
-    category_keywords = {
-        "Food & Dining": [
-            "restaurant", "cafe", "coffee", "starbucks", "mcdonald", "burger", "pizza",
-            "food", "dining", "lunch", "dinner", "breakfast", "snack", "grocery",
-            "supermarket", "walmart", "target", "costco", "whole foods", "trader joe",
-            "domino", "subway", "kfc", "taco bell", "chipotle", "panera", "dunkin",
-            "bakery", "deli", "bistro", "grill", "bar", "pub", "kitchen", "eatery"
-        ],
-        
-        "Transportation": [
-            "uber", "lyft", "taxi", "gas", "fuel", "parking", "metro", "bus",
-            "train", "airline", "flight", "car", "vehicle", "auto", "transport",
-            "toll", "subway", "transit", "rental", "hertz", "enterprise", "avis",
-            "shell", "exxon", "chevron", "bp", "mobil", "citgo", "speedway"
-        ],
-        
-        "Utilities": [
-            "electric", "electricity", "gas", "water", "internet", "phone", "cable",
-            "utility", "bill", "energy", "power", "heating", "cooling", "trash",
-            "waste", "sewer", "telecom", "verizon", "att", "comcast", "spectrum",
-            "xfinity", "cox", "dish", "directv", "netflix", "hulu", "spotify"
-        ],
-        
-        "Shopping": [
-            "amazon", "ebay", "store", "shop", "retail", "mall", "outlet", "purchase",
-            "buy", "clothing", "clothes", "shoes", "electronics", "home depot",
-            "lowes", "best buy", "apple", "microsoft", "nike", "adidas", "zara",
-            "h&m", "gap", "old navy", "macys", "nordstrom", "sears", "kohl",
-            "tj maxx", "marshall", "ross", "department", "boutique"
-        ],
-        
-        "Entertainment": [
-            "movie", "cinema", "theater", "concert", "music", "game", "gaming",
-            "entertainment", "fun", "leisure", "hobby", "sport", "gym", "fitness",
-            "club", "bar", "nightclub", "casino", "lottery", "ticket", "event",
-            "amusement", "park", "zoo", "museum", "gallery", "show", "performance",
-            "netflix", "hulu", "disney", "spotify", "youtube", "twitch", "steam"
-        ],
-        
-        "Healthcare": [
-            "doctor", "hospital", "medical", "health", "pharmacy", "medicine",
-            "dental", "dentist", "clinic", "urgent care", "emergency", "prescription",
-            "drug", "cvs", "walgreens", "rite aid", "insurance", "copay", "deductible",
-            "therapy", "physical therapy", "mental health", "counseling", "wellness"
-        ],
-        
-        "Income": [
-            "salary", "wage", "payroll", "income", "deposit", "payment", "refund",
-            "cashback", "bonus", "commission", "dividend", "interest", "transfer",
-            "reimbursement", "tax refund", "social security", "pension", "unemployment",
-            "freelance", "consulting", "contract", "gig", "tip", "gratuity"
-        ],
-        
-        "Education": [
-            "school", "university", "college", "education", "tuition", "book",
-            "textbook", "course", "class", "training", "workshop", "seminar",
-            "certification", "degree", "diploma", "student", "academic", "learning",
-            "library", "research", "study", "exam", "test", "scholarship"
-        ],
-        
-        "Banking": [
-            "bank", "atm", "fee", "charge", "overdraft", "maintenance", "service",
-            "transfer", "wire", "check", "deposit", "withdrawal", "balance",
-            "account", "credit", "debit", "loan", "mortgage", "interest",
-            "finance", "investment", "savings", "checking", "penalty"
-        ]
-    }
-    
     # Check each category for keyword matches
-    for category, keywords in category_keywords.items():
-        for keyword in keywords:
-            if keyword in desc_lower:
-                return category
+    category = _match_category(desc_lower)
+    if category is not None:
+        return category
     
     # Special handling for amounts (income detection)
     # If description contains positive indicators and amount context suggests income
@@ -107,6 +225,130 @@ def categorize_transaction(description: str) -> str:
     # Default category
     return "Others"
 
+if njit is not None:
+    @njit(cache=True)
+    def _sum_expenses_by_code(codes, amounts, n_categories):
+        totals = np.zeros(n_categories, dtype=np.float64)
+        counts = np.zeros(n_categories, dtype=np.int64)
+        for i in range(codes.shape[0]):
+            amount = amounts[i]
+            if amount < 0:
+                totals[codes[i]] -= amount
+                counts[codes[i]] += 1
+        return totals, counts
+
+def expense_totals_by_code(codes: np.ndarray, amounts: np.ndarray, n_categories: int):
+    """
+    Total expenses (negative amounts) per category code.
+
+    Uses a compiled Numba loop when Numba is installed and np.bincount
+    otherwise; either way no category strings are hashed.
+
+    Args:
+        codes (np.ndarray): Category code per transaction
+        amounts (np.ndarray): Amount per transaction
+        n_categories (int): Number of category codes
+
+    Returns:
+        tuple: (totals, counts) arrays indexed by category code, with
+        totals as positive amounts
+    """
+    if njit is not None:
+        return _sum_expenses_by_code(codes, amounts, n_categories)
+
+    expenses = amounts < 0
+    expense_codes = codes[expenses].astype(np.intp)
+    totals = np.bincount(expense_codes, weights=-amounts[expenses], minlength=n_categories)
+    counts = np.bincount(expense_codes, minlength=n_categories)
+    return totals, counts
+
+def lowercase_descriptions(series: pd.Series) -> pd.Series:
+    """
+    Lowercase a column of descriptions in one vectorized pass.
+
+    The result is reused for every category scan, so each description is
+    lowercased exactly once. Missing and non-text values become empty
+    strings, which categorize to "Others" just like in categorize_transaction.
+
+    Args:
+        series (pd.Series): Transaction descriptions
+
+    Returns:
+        pd.Series: Lowercased descriptions
+    """
+    try:
+        desc_lower = series.str.lower()
+    except AttributeError:
+        # No text at all, e.g. an empty or purely numeric column
+        return pd.Series("", index=series.index, dtype=object)
+    return desc_lower.fillna("")
+
+def categorize_many(descriptions: Iterable) -> pd.Categorical:
+    """
+    Categorize a batch of transaction descriptions.
+
+    Args:
+        descriptions (Iterable): Transaction descriptions
+
+    Returns:
+        pd.Categorical: Category for each description, stored as int8 codes
+        into CATEGORIES
+    """
+    if KEYWORD_AUTOMATON is None:
+        return pd.Categorical(
+            [categorize_transaction(description) for description in descriptions],
+            categories=CATEGORIES
+        )
+
+    # One automaton pass per description finds its first keyword id; the ids
+    # are then mapped to category codes in a single vectorized step. The income
+    # indicators used by categorize_transaction are all keywords already.
+    hits = np.fromiter(
+        (
+            _first_keyword_hit(description.lower()) if isinstance(description, str) else -1
+            for description in descriptions
+        ),
+        dtype=np.int32
+    )
+    return pd.Categorical.from_codes(keyword_hits_to_codes(hits), categories=CATEGORIES)
+
+def categorize_series(series: pd.Series) -> pd.Series:
+    """
+    Categorize a whole column of transaction descriptions at once.
+
+    Produces the same categories as calling categorize_transaction on every
+    row, but scans each distinct description once per category instead of
+    every row once per keyword.
+
+    Args:
+        series (pd.Series): Transaction descriptions
+
+    Returns:
+        pd.Series: Categorical category names, aligned with the input index
+    """
+    # Statements repeat the same descriptions a lot, so only lowercase and
+    # scan each distinct description once, then expand back to every row
+    row_codes, unique_descs = pd.factorize(series)
+    desc_lower = lowercase_descriptions(pd.Series(unique_descs))
+
+    # Walk categories in priority order, only filling descriptions still unmatched
+    unique_codes = np.full(len(desc_lower), OTHERS_CODE, dtype=np.int8)
+    for code, pattern in enumerate(CATEGORY_PATTERNS.values()):
+        mask = desc_lower.str.contains(pattern, regex=True, na=False).to_numpy()
+        unique_codes[mask & (unique_codes == OTHERS_CODE)] = code
+
+    # Missing descriptions factorize to -1, which picks the trailing "Others"
+    codes = np.append(unique_codes, np.int8(OTHERS_CODE))[row_codes]
+
+    # The income indicators used by categorize_transaction are already covered
+    # by the keyword lists, so no extra pass is needed for them. A categorical
+    # column stores one small integer code per row instead of a string.
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=CATEGORIES),
+        index=series.index,
+        name="Category"
+    )
+
 def get_category_emoji(category: str) -> str:
     """
     Get emoji for a given category.
@@ -3,10 +3,42 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from collections import namedtuple
 import io
+import numpy as np
+from pandas.tseries.api import guess_datetime_format
 
-# Import our categorization function
-from categorizer import categorize_transaction
+try:
+    import pyarrow
+    import pyarrow.csv
+except ImportError:
+    pyarrow = None
+
+# Import our categorization functions
+from categorizer import categorize_series, expense_totals_by_code
+
+# Filter-invariant figures shown above the transaction table
+SpendingSummary = namedtuple(
+    "SpendingSummary",
+    ["total_spending", "total_income", "net_amount", "total_transactions", "category_summary"]
+)
+
+# Parsed upload: transactions to display, the summary over the whole file and,
+# for streamed uploads, the CSV export of every row (None means build it from df)
+CategorizedUpload = namedtuple("CategorizedUpload", ["df", "summary", "csv_data"])
+
+# Uploads larger than this are streamed in chunks instead of loaded at once
+LARGE_FILE_BYTES = 50 * 1024 ** 2
+CHUNK_ROWS = 100_000
+
+# Number of most recent transactions kept for display when streaming
+DISPLAY_ROWS = 100_000
+
+# Rows shown per page of the transaction table
+PAGE_SIZE = 500
+
+# Date formats tried, in order, when parsing the uploaded Date column
+DATE_FORMATS = ('ISO8601', '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%d-%m-%Y')
 
 # Page configuration
 st.set_page_config(
@@ -40,6 +72,365 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def parse_dates(dates: pd.Series, date_format=None):
+    """
+    Parse the Date column, picking a format first if none is given.
+
+    Explicit formats let pandas use its fast parser instead of guessing each
+    value. Returning the chosen format lets a streamed file parse every chunk
+    the same way as its first one.
+
+    Args:
+        dates (pd.Series): Raw Date column
+        date_format (str): Format to parse with, or None to pick one
+
+    Returns:
+        tuple: (parsed dates, format used)
+
+    Raises:
+        ValueError: If the dates don't match the format or can't be parsed
+    """
+    pinned = date_format is not None
+    
+    if date_format is None:
+        for candidate in DATE_FORMATS:
+            try:
+                return pd.to_datetime(dates, format=candidate, cache=True), candidate
+            except (ValueError, TypeError):
+                continue
+        
+        # Fall back to the format pandas would infer from the first date
+        first_date = dates.dropna().head(1)
+        guessed = guess_datetime_format(str(first_date.iloc[0])) if len(first_date) else None
+        date_format = guessed or 'mixed'
+    
+    parsed = pd.to_datetime(dates, format=date_format, errors='coerce', cache=True)
+    if (parsed.isna() & dates.notna()).any():
+        if pinned:
+            raise ValueError(
+                f"Unable to parse Date column: some dates don't match the format "
+                f"'{date_format}' used earlier in the file. Please use one date format throughout."
+            )
+        raise ValueError("Unable to parse Date column. Please ensure dates are in a recognizable format.")
+    
+    return parsed, date_format
+
+def prepare_transactions(df: pd.DataFrame, date_format=None):
+    """
+    Validate, parse and categorize raw transactions read from a CSV.
+
+    Args:
+        df (pd.DataFrame): Raw transactions
+        date_format (str): Date format to parse with, or None to pick one
+
+    Returns:
+        tuple: (transactions with parsed Date/Amount, AmountCents and a
+        Category column, date format used)
+
+    Raises:
+        ValueError: If the data is missing columns or can't be parsed
+    """
+    # Validate required columns
+    required_columns = ['Date', 'Description', 'Amount']
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+    
+    # Convert Date column to datetime
+    df['Date'], date_format = parse_dates(df['Date'], date_format)
+    
+    # Daily dates don't need nanosecond resolution
+    df['Date'] = df['Date'].dt.as_unit('s')
+    
+    # Convert Amount to numeric
+    try:
+        df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
+        df = df.dropna(subset=['Amount'])
+    except Exception:
+        raise ValueError("Unable to parse Amount column. Please ensure amounts are numeric.")
+    
+    # Totals are computed from exact integer cents. When every amount is
+    # whole cents it can be rebuilt from them, so Amount is stored at half
+    # the width; finer or integer amounts are kept exactly as parsed.
+    amounts = df['Amount'].to_numpy()
+    df['AmountCents'] = np.rint(amounts * 100).astype(np.int64)
+    if df['Amount'].dtype.kind == 'f' and (df['AmountCents'].to_numpy() / 100 == amounts).all():
+        df['Amount'] = df['Amount'].astype('float32')
+    
+    # Categorize transactions
+    df['Category'] = categorize_series(df['Description'])
+    
+    return df, date_format
+
+def category_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Total the expenses of categorized transactions per category.
+
+    Args:
+        df (pd.DataFrame): Categorized transactions
+
+    Returns:
+        pd.DataFrame: Total_Amount and Transaction_Count per category
+    """
+    # Reduce over the integer category codes instead of grouping on labels
+    categories = df['Category'].cat.categories
+    sums, counts = expense_totals_by_code(
+        df['Category'].cat.codes.to_numpy(),
+        df['AmountCents'].to_numpy(),
+        len(categories)
+    )
+    
+    totals = pd.DataFrame(
+        {'Total_Amount': sums / 100, 'Transaction_Count': counts},
+        index=pd.CategoricalIndex(categories, categories=categories, name='Category')
+    )
+    return totals[totals['Transaction_Count'] > 0]
+
+def build_summary(total_income: float, total_transactions: int,
+                  totals: pd.DataFrame) -> SpendingSummary:
+    """
+    Assemble a SpendingSummary from totals and per-category expense totals.
+
+    Args:
+        total_income (float): Total income
+        total_transactions (int): Number of transactions
+        totals (pd.DataFrame): Per-category expense totals from category_totals
+
+    Returns:
+        SpendingSummary: Totals and the per-category expense summary
+    """
+    # Every expense belongs to exactly one category
+    total_spending = totals['Total_Amount'].sum()
+    net_amount = total_income - total_spending
+    category_summary = totals.round(2).sort_values('Total_Amount', ascending=False)
+    
+    return SpendingSummary(total_spending, total_income, net_amount,
+                           total_transactions, category_summary)
+
+def compute_summary(df: pd.DataFrame) -> SpendingSummary:
+    """
+    Compute the KPIs and per-category spending for a categorized DataFrame.
+
+    Args:
+        df (pd.DataFrame): Categorized transactions
+
+    Returns:
+        SpendingSummary: Totals and the per-category expense summary
+    """
+    total_income = df.loc[df['AmountCents'] > 0, 'AmountCents'].sum() / 100
+    
+    return build_summary(total_income, len(df), category_totals(df))
+
+@st.cache_data(show_spinner="🔄 Categorizing transactions...", max_entries=8, ttl="1h")
+def load_and_categorize(file_bytes: bytes) -> CategorizedUpload:
+    """
+    Parse an uploaded CSV, categorize its transactions and summarize them.
+
+    Cached on the raw file bytes so widget interactions don't re-parse
+    and re-categorize the same upload. The summary only depends on the
+    uploaded data, not on the filter widgets, so it is cached along with it.
+
+    Files larger than LARGE_FILE_BYTES are streamed in chunks: the summary
+    and the CSV export are accumulated chunk by chunk and only the most
+    recent DISPLAY_ROWS transactions are kept for display.
+
+    Args:
+        file_bytes (bytes): Contents of the uploaded CSV file
+
+    Returns:
+        CategorizedUpload: Transactions to display, the spending summary and,
+        for streamed files, the CSV export
+
+    Raises:
+        ValueError: If the file is missing columns or can't be parsed
+    """
+    # Arrow-backed strings are cheaper to store and scan than Python objects
+    description_dtype = {'Description': 'string[pyarrow]'} if pyarrow is not None else None
+    
+    if len(file_bytes) <= LARGE_FILE_BYTES:
+        df, _ = prepare_transactions(_read_csv(file_bytes, description_dtype))
+        upload = CategorizedUpload(df, compute_summary(df), None)
+    else:
+        upload = _load_in_chunks(file_bytes, description_dtype)
+    
+    # Sort once here so the transaction table can be paged by slicing
+    return upload._replace(df=upload.df.sort_values('Date', ascending=False, kind='stable'))
+
+def _read_csv(file_bytes: bytes, description_dtype) -> pd.DataFrame:
+    """
+    Read a whole CSV, using pyarrow's multithreaded parser when available.
+
+    Args:
+        file_bytes (bytes): Contents of the uploaded CSV file
+        description_dtype (dict): dtype passed to pd.read_csv, or None
+
+    Returns:
+        pd.DataFrame: Raw transactions
+    """
+    if pyarrow is not None:
+        # Read Date as plain text like the default parser does. pyarrow would
+        # otherwise infer timestamps and shift offset-aware dates to UTC
+        # before parse_dates ever sees them.
+        convert_options = pyarrow.csv.ConvertOptions(
+            column_types={'Date': pyarrow.string()},
+            strings_can_be_null=True
+        )
+        try:
+            table = pyarrow.csv.read_csv(io.BytesIO(file_bytes), convert_options=convert_options)
+        except ValueError:
+            # Let the default parser handle (and report on) anything pyarrow rejects
+            table = None
+        
+        # Repeated headers are left to pd.read_csv, which renames them (Amount.1)
+        if table is not None and len(set(table.column_names)) == table.num_columns:
+            df = table.to_pandas()
+            return df.astype(description_dtype) if 'Description' in df.columns else df
+    
+    return pd.read_csv(io.BytesIO(file_bytes), dtype=description_dtype)
+
+def _load_in_chunks(file_bytes: bytes, description_dtype, date_format=None) -> CategorizedUpload:
+    """
+    Stream a large CSV in chunks, accumulating the summary as it goes.
+
+    Args:
+        file_bytes (bytes): Contents of the uploaded CSV file
+        description_dtype (dict): dtype passed to pd.read_csv, or None
+        date_format (str): Date format for every chunk, or None to pick one
+            from the first chunk
+
+    Returns:
+        CategorizedUpload: Most recent DISPLAY_ROWS transactions, the
+        full-file summary and the CSV export of every transaction
+    """
+    total_income = 0.0
+    total_transactions = 0
+    partial_totals = []
+    csv_parts = []
+    df = None
+    
+    # A first chunk of only ambiguous dates such as 01/02/2024 is read
+    # month-first, but a later 13/04/2024 can still show the file is day-first
+    day_first_possible = date_format is None
+    
+    chunks = pd.read_csv(io.BytesIO(file_bytes), dtype=description_dtype, chunksize=CHUNK_ROWS)
+    for chunk in chunks:
+        # Every chunk is parsed with the date format picked for the first one
+        try:
+            chunk, date_format = prepare_transactions(chunk, date_format)
+        except ValueError:
+            if date_format == '%m/%d/%Y' and day_first_possible:
+                # Start over day-first, the next format parse_dates would try
+                return _load_in_chunks(file_bytes, description_dtype, '%d/%m/%Y')
+            raise
+        
+        if date_format != '%m/%d/%Y' or (chunk['Date'].dt.day > 12).any():
+            day_first_possible = False
+        
+        total_income += chunk.loc[chunk['AmountCents'] > 0, 'AmountCents'].sum() / 100
+        total_transactions += len(chunk)
+        partial_totals.append(category_totals(chunk))
+        csv_parts.append(
+            export_frame(chunk).to_csv(index=False, header=not csv_parts).encode('utf-8')
+        )
+        
+        # Keep the most recent transactions for display, wherever they sit in the file
+        if df is None:
+            df = chunk
+        else:
+            if df['Amount'].dtype != chunk['Amount'].dtype:
+                # Don't let concat widen float32 amounts into inexact float64 ones
+                df = df.assign(Amount=exact_amounts(df))
+                chunk = chunk.assign(Amount=exact_amounts(chunk))
+            df = pd.concat([df, chunk])
+        df = df.nlargest(DISPLAY_ROWS, 'Date')
+    
+    totals = pd.concat(partial_totals).groupby(level=0, observed=True).sum()
+    
+    summary = build_summary(total_income, total_transactions, totals)
+    return CategorizedUpload(df, summary, b"".join(csv_parts))
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_pie_chart(values: tuple, names: tuple) -> go.Figure:
+    """
+    Build the spending distribution pie chart.
+
+    Takes plain tuples so Streamlit can hash the cache key cheaply.
+
+    Args:
+        values (tuple): Total spending per category
+        names (tuple): Category names, matching values
+
+    Returns:
+        go.Figure: Plotly pie chart
+    """
+    fig = px.pie(
+        values=list(values),
+        names=list(names),
+        title="Spending Distribution by Category",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate='<b>%{label}</b><br>Amount: $%{value:,.2f}<br>Percentage: %{percent}<extra></extra>'
+    )
+    
+    fig.update_layout(
+        showlegend=True,
+        height=400,
+        font=dict(size=12)
+    )
+    
+    return fig
+
+def exact_amounts(df: pd.DataFrame) -> pd.Series:
+    """
+    Get transaction amounts as parsed, undoing the float32 storage.
+
+    Args:
+        df (pd.DataFrame): Categorized transactions
+
+    Returns:
+        pd.Series: Amount column, rebuilt from AmountCents if stored as float32
+    """
+    if df['Amount'].dtype == np.float32:
+        return df['AmountCents'] / 100
+    return df['Amount']
+
+def export_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepare categorized transactions for CSV export.
+
+    Args:
+        df (pd.DataFrame): Categorized transactions
+
+    Returns:
+        pd.DataFrame: Transactions with exact amounts and formatted dates
+    """
+    download_df = df.drop(columns='AmountCents')
+    download_df['Amount'] = exact_amounts(df)
+    download_df['Date'] = download_df['Date'].dt.strftime('%Y-%m-%d')
+    return download_df
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Encode categorized transactions as CSV for download.
+
+    Cached so the copy, date formatting and CSV encoding only happen once
+    per upload rather than on every rerun. Rows are written in their
+    original file order, not the newest-first display order.
+
+    Args:
+        df (pd.DataFrame): Categorized transactions
+
+    Returns:
+        bytes: UTF-8 encoded CSV
+    """
+    return export_frame(df.sort_index()).to_csv(index=False).encode('utf-8')
+
 def main():
     # Header
     st.markdown('<h1 class="main-header">💰 Smart Expense Categorizer</h1>', unsafe_allow_html=True)
@@ -79,57 +470,34 @@ def main():
     
     if uploaded_file is not None:
         try:
-            # Read the CSV file
-            df = pd.read_csv(uploaded_file)
-            
-            # Validate required columns
-            required_columns = ['Date', 'Description', 'Amount']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                st.error(f"Missing required columns: {', '.join(missing_columns)}")
-                st.info("Please ensure your CSV has columns: Date, Description, Amount")
-                return
-            
-            # Convert Date column to datetime
-            try:
-                df['Date'] = pd.to_datetime(df['Date'])
-            except:
-                st.error("Unable to parse Date column. Please ensure dates are in a recognizable format.")
-                return
-            
-            # Convert Amount to numeric
-            try:
-                df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
-                df = df.dropna(subset=['Amount'])
-            except:
-                st.error("Unable to parse Amount column. Please ensure amounts are numeric.")
-                return
-            
-            # Categorize transactions
-            st.header("🔄 Processing Transactions...")
-            progress_bar = st.progress(0)
-            
-            categories = []
-            for i, description in enumerate(df['Description']):
-                category = categorize_transaction(description)
-                categories.append(category)
-                progress_bar.progress((i + 1) / len(df))
-            
-            df['Category'] = categories
-            progress_bar.empty()
-            
+            df, summary, csv_data = load_and_categorize(uploaded_file.getvalue())
+        except ValueError as e:
+            st.error(str(e))
+            st.info("Please ensure your CSV has columns: Date, Description, Amount")
+            return
+        except Exception as e:
+            st.error(f"An error occurred while processing your file: {str(e)}")
+            st.info("Please check your file format and try again.")
+            return
+        
+        try:
             # Display success message
-            st.success(f"✅ Successfully processed {len(df)} transactions!")
+            st.success(f"✅ Successfully processed {summary.total_transactions} transactions!")
+            
+            if len(df) < summary.total_transactions:
+                st.info(
+                    f"Large file: showing the most recent {len(df):,} transactions below. "
+                    "KPIs, category analysis and the download cover the whole file."
+                )
             
             # KPIs Section
             st.header("📊 Key Performance Indicators")
             
             # Calculate metrics
-            total_spending = df[df['Amount'] < 0]['Amount'].sum() * -1  # Convert to positive
-            total_income = df[df['Amount'] > 0]['Amount'].sum()
-            net_amount = total_income - total_spending
-            total_transactions = len(df)
+            total_spending = summary.total_spending
+            total_income = summary.total_income
+            net_amount = summary.net_amount
+            total_transactions = summary.total_transactions
             
             # Display metrics in columns
             col1, col2, col3, col4 = st.columns(4)
@@ -166,52 +534,26 @@ def main():
             # Category-wise analysis
             st.header("📈 Category Analysis")
             
-            # Prepare data for visualization (only expenses)
-            expense_df = df[df['Amount'] < 0].copy()
-            expense_df['Amount'] = expense_df['Amount'] * -1  # Convert to positive for visualization
+            category_summary = summary.category_summary
             
-            if not expense_df.empty:
-                category_summary = expense_df.groupby('Category').agg({
-                    'Amount': ['sum', 'count'],
-                    'Description': 'first'
-                }).round(2)
-                
-                category_summary.columns = ['Total_Amount', 'Transaction_Count', 'Sample_Description']
-                category_summary = category_summary.sort_values('Total_Amount', ascending=False)
-                
+            if not category_summary.empty:
                 # Display category summary table
                 col1, col2 = st.columns([1, 1])
                 
                 with col1:
                     st.subheader("💳 Spending by Category")
                     st.dataframe(
-                        category_summary[['Total_Amount', 'Transaction_Count']],
+                        category_summary,
                         use_container_width=True
                     )
                 
                 with col2:
                     st.subheader("🥧 Spending Distribution")
                     
-                    # Create pie chart
-                    fig = px.pie(
-                        values=category_summary['Total_Amount'],
-                        names=category_summary.index,
-                        title="Spending Distribution by Category",
-                        color_discrete_sequence=px.colors.qualitative.Set3
-                    )
-                    
-                    fig.update_traces(
-                        textposition='inside',
-                        textinfo='percent+label',
-                        hovertemplate='<b>%{label}</b><br>Amount: $%{value:,.2f}<br>Percentage: %{percent}<extra></extra>'
-                    )
-                    
-                    fig.update_layout(
-                        showlegend=True,
-                        height=400,
-                        font=dict(size=12)
+                    fig = build_pie_chart(
+                        tuple(category_summary['Total_Amount']),
+                        tuple(category_summary.index)
                     )
-                    
                     st.plotly_chart(fig, use_container_width=True)
             
             # Display categorized transactions
@@ -246,9 +588,14 @@ def main():
             filtered_df = df[df['Category'].isin(selected_categories)]
             
             if len(date_range) == 2:
+                # Compare against timestamps rather than converting every row
+                # to a Python date; the end bound is exclusive midnight
+                tz = filtered_df['Date'].dt.tz
+                start_date = pd.Timestamp(date_range[0], tz=tz)
+                end_date = pd.Timestamp(date_range[1], tz=tz) + pd.Timedelta(days=1)
                 filtered_df = filtered_df[
-                    (filtered_df['Date'].dt.date >= date_range[0]) &
-                    (filtered_df['Date'].dt.date <= date_range[1])
+                    (filtered_df['Date'] >= start_date) &
+                    (filtered_df['Date'] < end_date)
                 ]
             
             if amount_filter == "Income Only":
@@ -256,24 +603,36 @@ def main():
             elif amount_filter == "Expenses Only":
                 filtered_df = filtered_df[filtered_df['Amount'] < 0]
             
-            # Display filtered data
+            # Display filtered data one page at a time so only PAGE_SIZE rows
+            # are sent to the browser; df is already sorted newest first
+            page_count = max(1, -(-len(filtered_df) // PAGE_SIZE))
+            page = 1
+            if page_count > 1:
+                page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+            
+            start = (page - 1) * PAGE_SIZE
+            page_df = filtered_df.iloc[start:start + PAGE_SIZE]
+            # Exact amounts for display; AmountCents is dropped so it isn't sent to the browser
+            page_df = page_df.assign(Amount=exact_amounts(page_df)).drop(columns='AmountCents')
+            
             st.dataframe(
-                filtered_df.sort_values('Date', ascending=False),
+                page_df,
                 use_container_width=True,
                 hide_index=True
             )
             
+            if page_count > 1:
+                st.caption(
+                    f"Showing transactions {start + 1:,}-{start + len(page_df):,} "
+                    f"of {len(filtered_df):,}"
+                )
+            
             # Download section
             st.header("💾 Download Categorized Data")
             
-            # Prepare download data
-            download_df = df.copy()
-            download_df['Date'] = download_df['Date'].dt.strftime('%Y-%m-%d')
-            
-            # Convert to CSV
-            csv_buffer = io.StringIO()
-            download_df.to_csv(csv_buffer, index=False)
-            csv_data = csv_buffer.getvalue()
+            # Prepare download data (streamed uploads already include every row)
+            if csv_data is None:
+                csv_data = to_csv_bytes(df)
             
             # Download button
             st.download_button(